@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Tuple
+from urllib.parse import quote
+
+import aiohttp
+import pandas as pd
+
+from data_loader import (
+    add_normalized_capacity,
+    cache_and_parse_txt,
+    load_cached_txt,
+    log_headers,
+    run_cli_check,
+)
+from google_auth import (
+    BACKOFF_BASE_SECONDS,
+    DRIVE_MEDIA_URL,
+    MAX_RETRIES,
+    SHEETS_VALUES_URL,
+    get_access_token,
+)
+from googlesheet_loader import (
+    SPREADSHEET_ID,
+    cell_row,
+    load_tab_widths,
+    tab_df_from_values,
+    tab_range,
+)
+
+log = logging.getLogger(__name__)
+
+# Max open connections across all in-flight requests
+MAX_CONNECTIONS: int = 10
+
+# Streaming read size for Drive downloads
+READ_CHUNK_SIZE: int = 1 << 20
+
+
+# Issue an authorized GET, retrying on HTTP 429 with exponential backoff (honors Retry-After)
+async def _get(session: aiohttp.ClientSession, url: str) -> aiohttp.ClientResponse:
+    for attempt in range(MAX_RETRIES + 1):
+        # Token refresh is blocking HTTP under a lock; keep it off the event loop
+        token = await asyncio.to_thread(get_access_token)
+        headers = {"Authorization": f"Bearer {token}"}
+        resp = await session.get(url, headers=headers)
+        if resp.status != 429 or attempt == MAX_RETRIES:
+            resp.raise_for_status()
+            return resp
+
+        retry_after = resp.headers.get("Retry-After")
+        resp.release()
+        try:
+            delay = float(retry_after)
+        except (TypeError, ValueError):
+            delay = BACKOFF_BASE_SECONDS * (2 ** attempt) + random.uniform(0, 1)
+        log.warning(f"Rate limited (429); retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+        await asyncio.sleep(delay)
+
+
+# Download a Drive file's raw bytes
+async def fetch_file(session: aiohttp.ClientSession, file_id: str) -> bytearray:
+    buf = bytearray()
+    async with await _get(session, DRIVE_MEDIA_URL.format(file_id=file_id)) as resp:
+        async for chunk in resp.content.iter_chunked(READ_CHUNK_SIZE):
+            buf.extend(chunk)
+    return buf
+
+
+# Fetch a tab's raw values from the Sheets API
+async def fetch_tab_values(session: aiohttp.ClientSession, initials: str) -> List[List[str]]:
+    if not SPREADSHEET_ID:
+        raise ValueError("SPREADSHEET_ID is not set in googlesheet_loader.py")
+
+    rng = quote(tab_range(initials), safe="")
+    url = SHEETS_VALUES_URL.format(spreadsheet_id=SPREADSHEET_ID, range=rng)
+    async with await _get(session, url) as resp:
+        payload = await resp.json()
+    return payload.get("values", [])
+
+
+# Load a tab as a validated DataFrame plus its Cell ID index
+async def fetch_tab_df(
+    session: aiohttp.ClientSession, initials: str
+) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    values = await fetch_tab_values(session, initials)
+    return tab_df_from_values(values, initials)
+
+
+# Load, validate and normalize a single cell's raw data and metadata
+async def fetch_and_parse(
+    session: aiohttp.ClientSession,
+    cell_id: str,
+    file_info: Dict[str, str],
+    tab_task: "asyncio.Task[Tuple[pd.DataFrame, Dict[str, int]]]",
+) -> Dict[str, Any]:
+    if not file_info.get("file_id"):
+        raise ValueError(f"{cell_id}: missing file_id in map.")
+
+    # Local caches first; parsing stays synchronous since it is cheap next to the network wait
+    raw_data = load_cached_txt(cell_id, file_info)
+    if raw_data is None:
+        data = await fetch_file(session, file_info["file_id"])
+        raw_data = cache_and_parse_txt(cell_id, file_info, data)
+    log_headers(raw_data, f"{cell_id} (.txt)")
+
+    # Tab is shared by every cell with the same initials and fetched only once
+    df, idx = await tab_task
+    metadata = cell_row(df, idx, cell_id, cell_id[:3]).to_dict()
+
+    add_normalized_capacity(raw_data, metadata)
+
+    log.info(f"Loaded & normalized: {cell_id}\n")
+    return {"raw_data": raw_data, "metadata": metadata}
+
+
+# Load all cell data concurrently; same result shape as data_loader.load_all_cell_data
+async def run(cell_map: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    # Detect tab widths up front (blocking call) so tab_range never blocks the loop
+    await asyncio.to_thread(load_tab_widths)
+
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tab_tasks = {
+            initials: asyncio.create_task(fetch_tab_df(session, initials))
+            for initials in {cell_id[:3] for cell_id in cell_map}
+        }
+        cell_tasks = [
+            asyncio.create_task(
+                fetch_and_parse(session, cell_id, file_info, tab_tasks[cell_id[:3]])
+            )
+            for cell_id, file_info in cell_map.items()
+        ]
+        # gather re-raises the first failure as-is (e.g. a missing Cell ID or a 404)
+        try:
+            results = await asyncio.gather(*cell_tasks)
+        finally:
+            # Stop whatever is still in flight before the session closes
+            pending = [*tab_tasks.values(), *cell_tasks]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return dict(zip(cell_map, results))
+
+
+# Blocking entry point for synchronous callers
+def load_all_cell_data_async(cell_map: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    return asyncio.run(run(cell_map))
+
+
+# CLI check
+if __name__ == "__main__":
+    run_cli_check(load_all_cell_data_async, "async_loader")
@@ -1,31 +1,54 @@
 import io
+import hashlib
 import logging
-from typing import Dict, Any
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import reduce
+from pathlib import Path
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+import numpy as np
 import pandas as pd
-from googleapiclient.http import MediaIoBaseDownload
-from google_auth import get_drive_service
-from googlesheet_loader import load_googlesheet
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+from file_scanner import get_available_cell_ids_from_drive, get_files_metadata
+from google_auth import DRIVE_MEDIA_URL, rest_get
+from googlesheet_loader import load_googlesheet, preload_tabs
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
 
+# Concurrent cell downloads (kept low to stay under Drive/Sheets rate limits)
+MAX_WORKERS: int = 8
+
+# Local cache of raw Drive .txt files, keyed by file id + md5Checksum (or modifiedTime)
+DRIVE_CACHE_DIR: Path = Path(".cache/drive")
+
+# Local cache of parsed (pre-normalization) .txt DataFrames as Parquet
+PARSED_CACHE_DIR: Path = Path(".cache/parsed")
+
+# Bump whenever parsing or dtype handling changes so older Parquet entries are ignored
+PARSER_VERSION: int = 1
+
+# Share of unique values below which a text column is stored as 'category'
+CATEGORY_MAX_UNIQUE_RATIO: float = 0.1
+
 # Normalize headers
-def _log_headers(df: pd.DataFrame, title: str) -> None:
+def log_headers(df: pd.DataFrame, title: str) -> None:
+    # Skip formatting entirely when INFO output is disabled
+    if not log.isEnabledFor(logging.INFO):
+        return
     log.info("-" * 40)
-    log.info(f"📑 Headers for {title}")
+    log.info("📑 Headers for %s", title)
     log.info("-" * 40)
     for col in df.columns:
-        log.info(f"  • {col}")
+        log.info("  • %s", col)
     log.info("")
 
-# Ensure capacity column exists and is numeric
+# Ensure capacity column exists (numeric check happens during conversion)
 def _validate_capacity_column(df: pd.DataFrame, capacity_col: str) -> None:
     if capacity_col not in df.columns:
         raise KeyError(f"Missing '{capacity_col}' in raw data. Available: {list(df.columns)}")
 
-    pd.to_numeric(df[capacity_col], errors="raise")
-
 # Normalize capacity by WE Active Material Mass (mg)
 def add_normalized_capacity(
     raw_df: pd.DataFrame,
@@ -34,7 +57,7 @@ def add_normalized_capacity(
     mass_key: str = "WE Active Material Mass (mg)",
 ) -> pd.DataFrame:
 
-    # Validate capacity column presence and numeric
+    # Validate capacity column presence
     _validate_capacity_column(raw_df, capacity_col)
 
     # Validate mass presence and numeric and > 0
@@ -49,81 +72,281 @@ def add_normalized_capacity(
 
     mass_g = mass_mg / 1000.0  # Mass unit conversion
 
-    # Convert capacity strictly
-    cap = pd.to_numeric(raw_df[capacity_col], errors="raise")
+    # Convert capacity strictly (raises if non-numeric); parsed columns are usually numeric already
+    cap_col = raw_df[capacity_col]
+    if not pd.api.types.is_numeric_dtype(cap_col):
+        cap_col = pd.to_numeric(cap_col, errors="raise")
+    cap = cap_col.to_numpy(dtype=np.float64, na_value=np.nan)
 
     # Disallow NaN or negative capacities
-    assert cap.notna().all(), "Capacity column contains NaN values after numeric conversion."
+    assert not np.isnan(cap).any(), "Capacity column contains NaN values after numeric conversion."
     assert (cap >= 0).all(), "Capacity column contains negative values (unexpected)."
 
     # Compute normalized capacity
-    raw_df["Normalized Capacity (mAh/g)"] = cap / mass_g
-
-    # Preview last 3 rows of raw & normalized with row index and WE mass in grams
-    tail_df = raw_df[[capacity_col, "Normalized Capacity (mAh/g)"]].tail(3)
-    log.info(f"  ↳ Using WE Active Material Mass: {mass_g} g")
-    log.info("  ↳ Capacity & Normalized Capacity preview (last 3 rows):")
-    for idx, row in tail_df.iterrows():
-        log.info(f"     Row {idx}: Capacity={row[capacity_col]} mAh, "
-                 f"Normalized={row['Normalized Capacity (mAh/g)']} mAh/g")
+    raw_df["Normalized Capacity (mAh/g)"] = np.divide(cap, mass_g)
+
+    log.info("  ↳ Using WE Active Material Mass: %s g", mass_g)
+
+    # Preview last 3 rows of raw & normalized with row index (diagnostic only)
+    if log.isEnabledFor(logging.DEBUG):
+        tail_df = raw_df[[capacity_col, "Normalized Capacity (mAh/g)"]].tail(3)
+        log.debug("  ↳ Capacity & Normalized Capacity preview (last 3 rows):")
+        for idx, capacity, normalized in tail_df.itertuples(index=True, name=None):
+            log.debug("     Row %s: Capacity=%s mAh, Normalized=%s mAh/g", idx, capacity, normalized)
     log.info("")
 
     return raw_df
 
 
-# Download and parse .txt file
-def download_and_parse_txt_file(file_id: str) -> pd.DataFrame:
-    service = get_drive_service()
-    request = service.files().get_media(fileId=file_id)
-    fh = io.BytesIO()
-    downloader = MediaIoBaseDownload(fh, request)
-    done = False
-    while not done:
-        _status, done = downloader.next_chunk()
-
-    text = fh.getvalue().decode("utf-8", errors="replace")
-    df = pd.read_csv(io.StringIO(text), sep="\t", engine="c", low_memory=False)
-    df.columns = df.columns.str.strip()
-    df.dropna(how="all", inplace=True)
+# Shrink parsed columns: downcast floats, low-cardinality text to 'category'
+def _shrink_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # Work by position so repeated column labels can't select a DataFrame
+    n_rows = len(df)
+    for i, dtype in enumerate(df.dtypes):
+        col = df.iloc[:, i]
+        if pd.api.types.is_float_dtype(dtype):
+            df.isetitem(i, pd.to_numeric(col, downcast="float"))
+        elif pd.api.types.is_object_dtype(dtype) and n_rows:
+            if col.nunique() / n_rows < CATEGORY_MAX_UNIQUE_RATIO:
+                df.isetitem(i, col.astype("category"))
     return df
 
 
-# Load all cell data from Google Drive and Google Sheets, validate, normalize, and return structured dictionary
-def load_all_cell_data(cell_file_map: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
-    result: Dict[str, Dict[str, Any]] = {}
+# Parse tab-delimited .txt bytes into a compact DataFrame
+def _parse_txt_bytes(data: Union[bytes, bytearray, memoryview]) -> pd.DataFrame:
+    return _shrink_dtypes(_read_txt_bytes(data))
 
-    for cell_id, file_info in cell_file_map.items():
-        file_id = file_info.get("file_id")
-        if not file_id:
-            raise ValueError(f"{cell_id}: missing file_id in map.")
 
-        # Load raw .txt
-        raw_data = download_and_parse_txt_file(file_id)
-        _log_headers(raw_data, f"{cell_id} (.txt)")
+# Make repeated column names unique the way pandas.read_csv does ("X", "X.1", "X.2", ...)
+def _dedup_names(names: List[str]) -> List[str]:
+    counts: Dict[str, int] = defaultdict(int)
+    unique: List[str] = []
+    for name in names:
+        count = counts[name]
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts[name]
+        unique.append(name)
+        counts[name] = count + 1
+    return unique
 
-        # Load metadata row from Google Sheets and convert to dictionary
-        metadata_series = load_googlesheet(cell_id)
-        metadata = metadata_series.to_dict()
 
-        # Perform mandatory normalization
-        add_normalized_capacity(raw_data, metadata)
+# Run pyarrow's CSV reader over tab-delimited bytes
+def _read_arrow_table(buf: pa.Buffer, column_types: Optional[Dict[str, pa.DataType]] = None) -> pa.Table:
+    return pacsv.read_csv(
+        pa.BufferReader(buf),
+        read_options=pacsv.ReadOptions(use_threads=True),
+        parse_options=pacsv.ParseOptions(delimiter="\t"),
+        convert_options=pacsv.ConvertOptions(
+            strings_can_be_null=True, column_types=column_types or {}
+        ),
+    )
 
-        # Store results
-        result[cell_id] = {"raw_data": raw_data, "metadata": metadata}
-        log.info(f"Loaded & normalized: {cell_id}\n")
 
-    return result
+# Read tab-delimited .txt bytes with pyarrow's multithreaded reader
+def _read_txt_bytes(data: Union[bytes, bytearray, memoryview]) -> pd.DataFrame:
+    buf = pa.py_buffer(data)
+    try:
+        table = _read_arrow_table(buf)
+        # Arrow infers date/time-looking text as temporal types; pandas kept them as strings
+        temporal = {f.name for f in table.schema if pa.types.is_temporal(f.type)}
+        if temporal:
+            table = _read_arrow_table(buf, {name: pa.string() for name in temporal})
+    except pa.ArrowInvalid as e:
+        # Fall back to pandas for files Arrow can't parse (e.g. invalid UTF-8)
+        log.warning(f"pyarrow could not parse file, falling back to pandas: {e}")
+        df = pd.read_csv(
+            io.BytesIO(data), sep="\t", engine="c", low_memory=False, encoding_errors="replace"
+        )
+        # Stripping can collide names ("X" vs "X "), so de-duplicate afterwards
+        df.columns = _dedup_names(df.columns.str.strip().tolist())
+        # Blank lines are already skipped by read_csv; this only catches delimiter-only lines.
+        # Such a row needs a null in every column, so check columns one at a time first.
+        if df.shape[1] and all(df.iloc[:, i].hasnans for i in range(df.shape[1])):
+            keep = df.notna().to_numpy().any(axis=1)
+            if not keep.all():
+                df = df[keep]
+        return df
 
+    # Arrow keeps repeated headers as-is; strip, then de-duplicate like pandas
+    table = table.rename_columns(_dedup_names([c.strip() for c in table.column_names]))
 
-# CLI check
-if __name__ == "__main__":
+    # Drop rows where every field is null (Arrow already skips blank lines). Such a row
+    # needs a null in every column, so the O(1) null counts usually rule it out.
+    if table.num_columns and all(col.null_count for col in table.columns):
+        keep = reduce(pc.or_, (pc.is_valid(col) for col in table.columns))
+        table = table.filter(keep)
+    return table.to_pandas()
+
+
+# Cache path for a Drive file at its current revision (None when no revision is known)
+def _drive_cache_path(file_info: Dict[str, str]) -> Optional[Path]:
+    modified_time = file_info.get("modifiedTime", "")
+    md5_checksum = file_info.get("md5Checksum", "")
+    # Without a revision stamp there is no way to tell a stale copy apart, so skip the cache
+    if not (md5_checksum or modified_time):
+        return None
+    # md5Checksum identifies the content itself, so prefer it over modifiedTime
+    stamp = md5_checksum or hashlib.sha1(modified_time.encode()).hexdigest()[:8]
+    return DRIVE_CACHE_DIR / f"{file_info.get('file_id', '')}_{stamp}.txt"
+
+
+# Store raw file bytes in the local cache
+def _write_drive_cache(cache_path: Path, data: Union[bytes, bytearray, memoryview]) -> None:
+    # Write to a temp file first so an interrupted run never leaves a partial cache entry
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(cache_path)
+
+
+# Parquet cache path for a cell's parsed .txt at a given revision
+def _parsed_cache_path(cell_id: str, file_info: Dict[str, str]) -> Optional[Path]:
+    stamp = file_info.get("md5Checksum") or file_info.get("modifiedTime", "")
+    if not stamp:
+        return None
+    raw_key = f"{PARSER_VERSION}:{file_info.get('file_id', '')}:{stamp}"
+    key = hashlib.md5(raw_key.encode()).hexdigest()[:8]
+    return PARSED_CACHE_DIR / f"{cell_id}_{key}.parquet"
+
+
+# Read a parsed DataFrame from the Parquet cache, if present
+def _read_parsed_cache(cache_path: Optional[Path]) -> Optional[pd.DataFrame]:
+    if cache_path is None or not cache_path.exists():
+        return None
     try:
-        from file_scanner import get_available_cell_ids_from_drive
+        return pd.read_parquet(cache_path)
+    except (OSError, ValueError, pa.ArrowException) as e:
+        # Truncated or corrupt entry: drop it so the cell is downloaded and parsed again
+        log.warning(f"Discarding unreadable parsed cache {cache_path}: {e}")
+        cache_path.unlink(missing_ok=True)
+        return None
+
+
+# Store a parsed DataFrame in the Parquet cache (best effort)
+def _write_parsed_cache(cache_path: Optional[Path], df: pd.DataFrame) -> None:
+    if cache_path is None:
+        return
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    try:
+        df.to_parquet(tmp_path, compression="zstd")
+    except (OSError, ValueError, pa.ArrowException) as e:
+        # e.g. a column type Parquet can't store; the Drive byte cache still covers this file
+        log.warning(f"Could not cache parsed data at {cache_path}: {e}")
+        tmp_path.unlink(missing_ok=True)
+        return
+    tmp_path.replace(cache_path)
+
+
+# Load a cell's parsed .txt from the local caches; None when it must be downloaded
+def load_cached_txt(cell_id: str, file_info: Dict[str, str]) -> Optional[pd.DataFrame]:
+    parsed_path = _parsed_cache_path(cell_id, file_info)
+    df = _read_parsed_cache(parsed_path)
+    if df is None:
+        drive_path = _drive_cache_path(file_info)
+        if drive_path is not None and drive_path.exists():
+            df = _parse_txt_bytes(drive_path.read_bytes())
+            _write_parsed_cache(parsed_path, df)
+    return df
 
+
+# Parse freshly downloaded .txt bytes and store them in both local caches
+def cache_and_parse_txt(
+    cell_id: str,
+    file_info: Dict[str, str],
+    data: Union[bytes, bytearray, memoryview],
+) -> pd.DataFrame:
+    drive_path = _drive_cache_path(file_info)
+    if drive_path is not None:
+        _write_drive_cache(drive_path, data)
+    df = _parse_txt_bytes(data)
+    _write_parsed_cache(_parsed_cache_path(cell_id, file_info), df)
+    return df
+
+
+# Download and parse a cell's .txt file (served from local caches when unchanged)
+def download_and_parse_txt_file(cell_id: str, file_info: Dict[str, str]) -> pd.DataFrame:
+    raw_data = load_cached_txt(cell_id, file_info)
+    if raw_data is not None:
+        return raw_data
+
+    # Single GET over the shared HTTP/2 client, parsed straight from the response body
+    data = rest_get(DRIVE_MEDIA_URL.format(file_id=file_info["file_id"])).content
+    return cache_and_parse_txt(cell_id, file_info, data)
+
+
+# Load, validate and normalize a single cell's raw data and metadata
+def _ingest_one(cell_id: str, file_info: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+    file_id = file_info.get("file_id")
+    if not file_id:
+        raise ValueError(f"{cell_id}: missing file_id in map.")
+
+    # Load raw .txt (local caches skip the download and parse when unchanged)
+    raw_data = download_and_parse_txt_file(cell_id, file_info)
+    log_headers(raw_data, f"{cell_id} (.txt)")
+
+    # Load metadata row from Google Sheets and convert to dictionary
+    metadata_series = load_googlesheet(cell_id)
+    metadata = metadata_series.to_dict()
+
+    # Perform mandatory normalization
+    add_normalized_capacity(raw_data, metadata)
+
+    log.info(f"Loaded & normalized: {cell_id}\n")
+    return cell_id, {"raw_data": raw_data, "metadata": metadata}
+
+
+# Load all cell data from Google Drive and Google Sheets, validate, normalize, and return structured dictionary
+def load_all_cell_data(cell_file_map: Dict[str, Dict[str, str]]) -> Dict[str, Dict[str, Any]]:
+    loaded: Dict[str, Dict[str, Any]] = {}
+
+    # Look up md5Checksum (cache key) in batches for files listed without one
+    missing_md5 = [
+        info["file_id"] for info in cell_file_map.values()
+        if info.get("file_id") and not info.get("md5Checksum")
+    ]
+    if missing_md5:
+        fresh = get_files_metadata(missing_md5)
+        cell_file_map = {
+            cell_id: {**info, **fresh.get(info.get("file_id", ""), {})}
+            for cell_id, info in cell_file_map.items()
+        }
+
+    # Fetch every needed metadata tab in a single Sheets call
+    preload_tabs({cell_id[:3] for cell_id in cell_file_map})
+
+    # Cells are I/O-bound (Drive download + Sheets fetch), so load them concurrently
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(_ingest_one, cell_id, file_info)
+            for cell_id, file_info in cell_file_map.items()
+        ]
+        try:
+            for future in as_completed(futures):
+                cell_id, data = future.result()
+                loaded[cell_id] = data
+        except BaseException:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    # Store results in the same order as the input map
+    result: Dict[str, Dict[str, Any]] = {cell_id: loaded[cell_id] for cell_id in cell_file_map}
+    return result
+
+
+# CLI check shared by the threaded and async loaders
+def run_cli_check(
+    load_fn: Callable[[Dict[str, Dict[str, str]]], Dict[str, Dict[str, Any]]],
+    name: str,
+) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    try:
         cell_map = get_available_cell_ids_from_drive()
         print(f"🔍 Found {len(cell_map)} .txt files in Drive folder.\n")
 
-        cell_data = load_all_cell_data(cell_map)
+        cell_data = load_fn(cell_map)
 
         # Summary
         for cell_id, data in cell_data.items():
@@ -132,8 +355,12 @@ if __name__ == "__main__":
             we = meta.get("Working Electrode", "N/A")
             print(f"{cell_id}: {we} | {len(df)} rows loaded | columns: {len(df.columns)}")
 
-        print("\n data_loader run PASSED.")
+        print(f"\n {name} run PASSED.")
 
     except Exception as e:
-        print(f" data_loader run FAILED: {e}")
+        print(f" {name} run FAILED: {e}")
         raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run_cli_check(load_all_cell_data, "data_loader")
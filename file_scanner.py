@@ -1,35 +1,57 @@
-import re
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Set
 
-from google_auth import get_drive_service
+from google_auth import call_with_backoff, get_drive_service
 
 # Define Google Driver folder ID where .txt files are stored
 FOLDER_ID = "1TdfI0rCaXMy1UVeob1uuuca_GKsBfgZi"
 
-# Pattern: start-of-string, initials (>=2 letters), digits (>=4), and finally underscore
-CELL_ID_RE = re.compile(r"^([A-Za-z]{2,}\d{4,})_")
+# Max calls per Drive batch request (API allows 100, but large batches get rate limited)
+METADATA_BATCH_SIZE = 25
 
 # Extract 'CellID' from .txt filename
+# Pattern: start-of-string, initials (>=2 ASCII letters), digits (>=4), and finally underscore
 def _extract_cell_id(filename: str) -> Optional[str]:
-    m = CELL_ID_RE.match(filename)
-    return m.group(1) if m else None
+    us = filename.find("_")
+    if us < 6:
+        return None  # Too short for 2 letters + 4 digits (or no underscore)
+    head = filename[:us]
 
-# Get available cell IDs from Google Drive folder
+    # Find where the initials stop
+    i = 0
+    while i < us and head[i].isascii() and head[i].isalpha():
+        i += 1
+    digits = head[i:]
+    if i < 2 or len(digits) < 4 or not digits.isdecimal():
+        return None
+    return head
+
+# Get available cell IDs from Google Drive folder, optionally limited to some initials
 # Returns dictionary:
 # {
 #   cell_id: {
 #     "file_id": <Drive file id>,
 #     "filename": <file name>,
 #     "modifiedTime": <RFC3339 string>,
-#     "size": <string of bytes>
+#     "size": <string of bytes>,
+#     "md5Checksum": <hex digest>
 #   },
-# }     
-def get_available_cell_ids_from_drive() -> Dict[str, Dict[str, str]]:
+# }
+def get_available_cell_ids_from_drive(
+    initials_filter: Optional[Set[str]] = None,
+) -> Dict[str, Dict[str, str]]:
     service = get_drive_service()
     cell_map: Dict[str, Dict[str, str]] = {}
 
-    query = f"'{FOLDER_ID}' in parents and trashed = false"
-    fields = "nextPageToken, files(id, name, modifiedTime, size)"
+    # Filter server-side so only plain-text files (and matching initials) are paged back
+    query = f"'{FOLDER_ID}' in parents and trashed = false and mimeType = 'text/plain'"
+    if initials_filter:
+        # Drive's 'name contains' matches name prefixes, which is where the initials sit
+        clauses = " or ".join(
+            "name contains '{}'".format(init.replace("\\", "\\\\").replace("'", "\\'"))
+            for init in sorted(initials_filter)
+        )
+        query += f" and ({clauses})"
+    fields = "nextPageToken, files(id, name, modifiedTime, size, md5Checksum)"
     page_token = None
     # Paginates 1000 results per page 
     while True:
@@ -50,6 +72,8 @@ def get_available_cell_ids_from_drive() -> Dict[str, Dict[str, str]]:
             if not cell_id:
                 print(f"Skipping file with invalid Cell ID format: {filename}")
                 continue
+            if initials_filter and not cell_id.startswith(tuple(initials_filter)):
+                continue  # Name matched the query on a later word, not the Cell ID prefix
 
             # If cell_id already exists, use most recent file or ignore older duplicates
             if cell_id not in cell_map:
@@ -58,6 +82,7 @@ def get_available_cell_ids_from_drive() -> Dict[str, Dict[str, str]]:
                     "filename": filename,
                     "modifiedTime": file.get("modifiedTime", ""),
                     "size": file.get("size", ""),
+                    "md5Checksum": file.get("md5Checksum", ""),
                 }
             
 
@@ -66,3 +91,40 @@ def get_available_cell_ids_from_drive() -> Dict[str, Dict[str, str]]:
             break
 
     return cell_map
+
+
+# Get current metadata for many Drive files, grouping files().get calls into batch requests
+# Returns dictionary:
+# {
+#   file_id: {
+#     "modifiedTime": <RFC3339 string>,
+#     "size": <string of bytes>,
+#     "md5Checksum": <hex digest>
+#   },
+# }
+def get_files_metadata(file_ids: Iterable[str]) -> Dict[str, Dict[str, str]]:
+    service = get_drive_service()
+    metadata: Dict[str, Dict[str, str]] = {}
+
+    def _on_response(request_id, response, exception):
+        if exception is not None:
+            print(f"Skipping metadata for file {request_id}: {exception}")
+            return
+        metadata[request_id] = {
+            "modifiedTime": response.get("modifiedTime", ""),
+            "size": response.get("size", ""),
+            "md5Checksum": response.get("md5Checksum", ""),
+        }
+
+    # Batch request ids must be unique
+    ids = list(dict.fromkeys(file_ids))
+    for start in range(0, len(ids), METADATA_BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_on_response)
+        for file_id in ids[start:start + METADATA_BATCH_SIZE]:
+            batch.add(
+                service.files().get(fileId=file_id, fields="id, modifiedTime, size, md5Checksum"),
+                request_id=file_id,
+            )
+        call_with_backoff(batch.execute)
+
+    return metadata
@@ -1,12 +1,15 @@
 import os
+import random
 import logging
-from functools import lru_cache
-from typing import List, Optional, Tuple
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+import httpx
+from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
 log = logging.getLogger(__name__)
 
 # Credentials file path
@@ -20,6 +23,32 @@ REQUIRED_SCOPES: List[str] = [
 
 DEFAULT_SPREADSHEET_ID: Optional[str] = "1DnQTSfwymCfGzIjAr87L2rfhqMCC-aLjJcDYAR_XbWw"
 
+# Raw REST endpoints used for per-cell reads
+DRIVE_MEDIA_URL: str = "https://www.googleapis.com/drive/v3/files/{file_id}?alt=media"
+SHEETS_VALUES_URL: str = "https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values/{range}"
+SHEETS_METADATA_URL: str = "https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}"
+SHEETS_BATCH_GET_URL: str = "https://sheets.googleapis.com/v4/spreadsheets/{spreadsheet_id}/values:batchGet"
+
+# Timeout (seconds) for raw REST calls
+HTTP_TIMEOUT_SECONDS: float = 60.0
+
+# Retry settings for rate-limited (HTTP 429) API calls
+MAX_RETRIES: int = 5
+BACKOFF_BASE_SECONDS: float = 1.0
+
+# Per-thread client cache (httplib2 transport is not thread-safe)
+_thread_local = threading.local()
+
+# Shared credentials for raw REST calls, refreshed on expiry
+_token_lock = threading.Lock()
+_token_creds = None
+
+# Shared HTTP/2 client (thread-safe; multiplexes requests over one connection)
+_client_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+
+T = TypeVar("T")
+
 def _load_credentials():
     if not os.path.exists(SERVICE_ACCOUNT_FILE):
         raise FileNotFoundError(
@@ -43,21 +72,101 @@ def _load_credentials():
 def _build_service(api_name: str, api_version: str):
     creds = _load_credentials()
     try:
-        return build(api_name, api_version, credentials=creds, cache_discovery=False)
+        # static_discovery=True is already the default without a discoveryServiceUrl
+        # (googleapiclient >= 2.0); pinned here so a future URL override can't switch it off
+        return build(
+            api_name,
+            api_version,
+            credentials=creds,
+            static_discovery=True,
+            cache_discovery=False,
+        )
     except Exception as e:
         raise RuntimeError(f"Failed to build {api_name} v{api_version} client: {e}") from e
 
-# Return cached Google Drive Client    
-@lru_cache(maxsize=None)
+# Return a valid OAuth bearer token for raw REST calls (refreshed when expired)
+def get_access_token() -> str:
+    global _token_creds
+    with _token_lock:
+        if _token_creds is None:
+            _token_creds = _load_credentials()
+        if not _token_creds.valid:
+            _token_creds.refresh(Request())
+        return _token_creds.token
+
+# Attach a fresh bearer token to every request sent by the HTTP/2 client
+class _BearerAuth(httpx.Auth):
+    def auth_flow(self, request: httpx.Request):
+        request.headers["Authorization"] = f"Bearer {get_access_token()}"
+        yield request
+
+# Return the shared HTTP/2 client for raw REST calls
+def get_http_client() -> httpx.Client:
+    global _http_client
+    with _client_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                http2=True, auth=_BearerAuth(), timeout=HTTP_TIMEOUT_SECONDS
+            )
+        return _http_client
+
+# Authorized GET over the shared client; raises on HTTP errors, retries 429s
+def rest_get(url: str, params: Optional[Dict[str, Any]] = None) -> httpx.Response:
+    def _send() -> httpx.Response:
+        resp = get_http_client().get(url, params=params)
+        resp.raise_for_status()
+        return resp
+    return call_with_backoff(_send)
+
+# Return API service cached for the calling thread
+def _get_thread_service(api_name: str, api_version: str):
+    key = f"{api_name}_{api_version}"
+    svc = getattr(_thread_local, key, None)
+    if svc is None:
+        svc = _build_service(api_name, api_version)
+        setattr(_thread_local, key, svc)
+    return svc
+
+# Return cached Google Drive Client
 def get_drive_service():
-    """Return a cached Google Drive v3 client."""
-    return _build_service("drive", "v3")
+    """Return a Google Drive v3 client cached per thread."""
+    return _get_thread_service("drive", "v3")
 
 # Return cached Google Sheets Client
-@lru_cache(maxsize=None)
 def get_sheets_service():
-    """Return a cached Google Sheets v4 client."""
-    return _build_service("sheets", "v4")
+    """Return a Google Sheets v4 client cached per thread."""
+    return _get_thread_service("sheets", "v4")
+
+# Exponential backoff delay with jitter for a retry attempt
+def _backoff_delay(attempt: int) -> float:
+    return BACKOFF_BASE_SECONDS * (2 ** attempt) + random.uniform(0, 1)
+
+# Call fn, retrying on HTTP 429 (honors Retry-After) and httpx transport errors with exponential backoff
+def call_with_backoff(fn: Callable[[], T], max_retries: int = MAX_RETRIES) -> T:
+    for attempt in range(max_retries + 1):
+        try:
+            return fn()
+        except (HttpError, httpx.HTTPStatusError) as e:
+            if isinstance(e, HttpError):
+                status, headers = e.resp.status, e.resp
+            else:
+                status, headers = e.response.status_code, e.response.headers
+            if status != 429 or attempt == max_retries:
+                raise
+            retry_after = headers.get("retry-after")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = _backoff_delay(attempt)
+            log.warning(f"Rate limited (429); retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
+        except httpx.TransportError as e:
+            # Timeouts, resets and HTTP/2 GOAWAY; the client reconnects on the next attempt
+            if attempt == max_retries:
+                raise
+            delay = _backoff_delay(attempt)
+            log.warning(f"Transport error ({e!r}); retrying in {delay:.1f}s ({attempt + 1}/{max_retries})")
+            time.sleep(delay)
 
 # Try to validate Google Drive access
 def validate_drive_access() -> Tuple[bool, str]:
@@ -85,6 +194,7 @@ def validate_sheets_access(spreadsheet_id: Optional[str]=None) -> Tuple[bool, st
     
 # CLI check
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
     log.info("Running google_auth self-check...")
     log.info(f"Using SERVICE_ACCOUNT_FILE: {SERVICE_ACCOUNT_FILE}")
 
@@ -1,12 +1,20 @@
 import os
 import logging
-from functools import lru_cache
-from typing import Optional, List
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, Optional, List, Tuple
+from urllib.parse import quote
+import httpx
+import numpy as np
 import pandas as pd
-from google_auth import get_sheets_service  
+from google_auth import (
+    SHEETS_BATCH_GET_URL,
+    SHEETS_METADATA_URL,
+    SHEETS_VALUES_URL,
+    get_sheets_service,
+    rest_get,
+)
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format="%(message)s")
 log = logging.getLogger(__name__)
 
 # Configure Google Sheet ID
@@ -19,6 +27,22 @@ REQUIRED_HEADERS: List[str] = [
     "WE Active Material Mass (mg)",
 ]
 
+# Raw tab values fetched ahead of time by preload_tabs, consumed by _get_tab_df
+_PRELOADED_VALUES: Dict[str, list] = {}
+
+# Loaded tabs (DataFrame + Cell ID index); per-tab locks so concurrent loaders fetch each tab once
+_TAB_CACHE: Dict[str, Tuple[pd.DataFrame, Dict[str, int]]] = {}
+_TAB_LOCKS: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_TAB_LOCKS_GUARD = threading.Lock()
+
+# Last column letter of each tab, detected once from the spreadsheet's grid sizes
+_TAB_WIDTH_CACHE: Dict[str, str] = {}
+_TAB_WIDTH_LOCK = threading.Lock()
+_tab_widths_loaded: bool = False
+
+# Last column requested when a tab's width is unknown
+DEFAULT_LAST_COLUMN: str = "ZZ"
+
 
 # Create DataFrame from Sheet headers and normalize 
 def _values_to_dataframe(values: list[list[str]]) -> pd.DataFrame:
@@ -26,7 +50,14 @@ def _values_to_dataframe(values: list[list[str]]) -> pd.DataFrame:
         return pd.DataFrame()
     headers = [(h or "").replace("\n", " ").strip() for h in values[0]]
     rows = values[1:] if len(values) > 1 else []
-    return pd.DataFrame(rows, columns=headers)
+
+    # Sheets trims trailing empty cells, so pad ragged rows into one object array up front
+    width = len(headers)
+    arr = np.full((len(rows), width), "", dtype=object)
+    for i, r in enumerate(rows):
+        r = r[:width]
+        arr[i, :len(r)] = r
+    return pd.DataFrame(arr, columns=headers, copy=False)
 
 # Validate required headers are present
 def _validate_headers(df: pd.DataFrame, initials: str) -> None:
@@ -37,37 +68,128 @@ def _validate_headers(df: pd.DataFrame, initials: str) -> None:
             f"Found columns: {list(df.columns)}"
         )
 
-# Fetch and cache a tab as a DataFrame
-@lru_cache(maxsize=64)
-def _get_tab_df(initials: str) -> pd.DataFrame:
+# Convert a 1-based column count to its A1 column letter (1 -> A, 27 -> AA)
+def _column_letter(n: int) -> str:
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+# Fetch every tab's column count in one metadata call and cache it
+def load_tab_widths() -> None:
+    global _tab_widths_loaded
+    with _TAB_WIDTH_LOCK:
+        if _tab_widths_loaded:
+            return
+
+        url = SHEETS_METADATA_URL.format(spreadsheet_id=SPREADSHEET_ID)
+        fields = "sheets(properties(title,gridProperties(columnCount)))"
+        try:
+            meta = rest_get(url, params={"fields": fields}).json()
+        except httpx.HTTPStatusError as e:
+            log.warning(f"Could not detect tab widths, using A:{DEFAULT_LAST_COLUMN}: {e}")
+        else:
+            for sheet in meta.get("sheets", []):
+                props = sheet.get("properties", {})
+                count = props.get("gridProperties", {}).get("columnCount")
+                if count:
+                    _TAB_WIDTH_CACHE[props["title"]] = _column_letter(count)
+        _tab_widths_loaded = True
+
+# A1 range covering a tab's actual columns
+def tab_range(initials: str) -> str:
+    load_tab_widths()
+    return f"'{initials}'!A:{_TAB_WIDTH_CACHE.get(initials, DEFAULT_LAST_COLUMN)}"
+
+# Map each Cell ID to its row position (first occurrence wins, matching a mask lookup)
+def _index_cell_ids(df: pd.DataFrame) -> Dict[str, int]:
+    idx: Dict[str, int] = {}
+    for i, cid in enumerate(df["Cell ID"].tolist()):
+        idx.setdefault(cid, i)
+    return idx
+
+# Return the lock guarding a tab's first fetch
+def _tab_lock(initials: str) -> threading.Lock:
+    with _TAB_LOCKS_GUARD:
+        return _TAB_LOCKS[initials]
+
+# Fetch and cache a tab as a DataFrame plus its Cell ID index
+def _get_tab_df(initials: str) -> Tuple[pd.DataFrame, Dict[str, int]]:
     if not SPREADSHEET_ID:
         raise ValueError("SPREADSHEET_ID is not set in googlesheet_loader.py")
 
-    sheets = get_sheets_service()
-    rng = f"'{initials}'!A:ZZ" 
-    result = sheets.spreadsheets().values().get(
-        spreadsheetId=SPREADSHEET_ID,
-        range=rng,
-    ).execute()
-    values = result.get("values", [])
+    # Only the first thread fetches; others wait on the lock and reuse its result
+    with _tab_lock(initials):
+        cached = _TAB_CACHE.get(initials)
+        if cached is not None:
+            return cached
+
+        values = _PRELOADED_VALUES.pop(initials, None)
+        if values is None:
+            rng = quote(tab_range(initials), safe="")
+            url = SHEETS_VALUES_URL.format(spreadsheet_id=SPREADSHEET_ID, range=rng)
+            values = rest_get(url).json().get("values", [])
+        tab = tab_df_from_values(values, initials)
+        _TAB_CACHE[initials] = tab
+        return tab
+
+
+# Build a validated tab DataFrame and its Cell ID index from raw Sheets values
+def tab_df_from_values(values: list[list[str]], initials: str) -> Tuple[pd.DataFrame, Dict[str, int]]:
     df = _values_to_dataframe(values)
     if df.empty:
         raise ValueError(f"Tab '{initials}' is empty or missing headers.")
 
     _validate_headers(df, initials)
-    return df
+    return df, _index_cell_ids(df)
+
+
+# Fetch several tabs in one batchGet call so later _get_tab_df lookups skip the API
+def preload_tabs(initials_list: Iterable[str]) -> None:
+    if not SPREADSHEET_ID:
+        raise ValueError("SPREADSHEET_ID is not set in googlesheet_loader.py")
+
+    # Tabs already loaded this process need no refetch
+    initials_list = sorted(set(initials_list) - _TAB_CACHE.keys())
+    if not initials_list:
+        return
+
+    # Leave out tabs known not to exist; one bad range would fail the whole batch
+    load_tab_widths()
+    if _TAB_WIDTH_CACHE:
+        initials_list = [i for i in initials_list if i in _TAB_WIDTH_CACHE]
+    if not initials_list:
+        return
+
+    ranges = [tab_range(i) for i in initials_list]
+    url = SHEETS_BATCH_GET_URL.format(spreadsheet_id=SPREADSHEET_ID)
+    try:
+        result = rest_get(url, params={"ranges": ranges}).json()
+    except httpx.HTTPStatusError as e:
+        # A single bad range (e.g. missing tab) fails the whole batch; fall back to per-tab loads
+        log.warning(f"Batch preload of tabs {initials_list} failed, loading per tab: {e}")
+        return
+
+    # valueRanges come back in the same order as the requested ranges
+    for initials, value_range in zip(initials_list, result.get("valueRanges", [])):
+        _PRELOADED_VALUES[initials] = value_range.get("values", [])
 
 
 # Load a cell's metadata from its initials tab
 def load_googlesheet(cell_id: str) -> pd.Series:
     initials = cell_id[:3]
-    df = _get_tab_df(initials)
+    df, idx = _get_tab_df(initials)
+    return cell_row(df, idx, cell_id, initials)
+
 
-    row = df.loc[df["Cell ID"] == cell_id]
-    if row.empty:
+# Select a cell's metadata row from its tab DataFrame via the Cell ID index
+def cell_row(df: pd.DataFrame, idx: Dict[str, int], cell_id: str, initials: str) -> pd.Series:
+    pos = idx.get(cell_id)
+    if pos is None:
         raise ValueError(f"Cell ID '{cell_id}' not found in tab '{initials}'.")
 
-    s = row.iloc[0]
+    s = df.iloc[pos]
     s.index = s.index.str.strip()
 
     mass_key = "WE Active Material Mass (mg)"
@@ -111,7 +233,7 @@ def _self_check() -> int:
         log.info(f"Spreadsheet reachable. Using tab '{initials}' for validation.\n")
 
         # Headers
-        df = _get_tab_df(initials)
+        df, _idx = _get_tab_df(initials)
         log.info("-" * 40)
         log.info(f"📑 Headers for '{initials}'")
         log.info("-" * 40)
@@ -152,4 +274,5 @@ def _self_check() -> int:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     raise SystemExit(_self_check())